@@ -7,8 +7,9 @@ import pandas as pd
 import json
 import os
 import time
-import requests
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from _sp500_wiki import load_table
 
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'raw')
 PROCESSED_DIR = os.path.join(os.path.dirname(__file__), '..', 'processed')
@@ -16,59 +17,55 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(PROCESSED_DIR, exist_ok=True)
 
 def get_sp500_tickers():
-    """Scrape current S&P 500 tickers from Wikipedia."""
-    url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-    
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    
-    # Use StringIO to wrap the HTML content
-    table = pd.read_html(StringIO(response.text))
-    df = table[0]
+    """Scrape current S&P 500 tickers from Wikipedia (refreshes the shared cache)."""
+    df = load_table(refresh=True)
     tickers = df['Symbol'].tolist()
     # Fix tickers with dots (BRK.B -> BRK-B for Yahoo Finance)
     tickers = [t.replace('.', '-') for t in tickers]
     return sorted(tickers)
 
-def fetch_prices(tickers, start='2017-06-01', end='2021-06-30'):
+def fetch_close(ticker, start, end, max_retries=4):
+    """
+    Fetch adjusted close for one ticker, retrying rate-limit / network
+    errors with exponential backoff. Returns None if every attempt fails.
+    """
+    for attempt in range(max_retries):
+        try:
+            hist = yf.Ticker(ticker).history(start=start, end=end,
+                                             auto_adjust=True, raise_errors=True)
+            closes = hist['Close'].rename(ticker)
+            closes.index = closes.index.tz_localize(None)
+            return closes
+        except Exception as e:
+            if attempt == max_retries - 1:
+                print(f"  Error fetching {ticker}: {e}")
+                return None
+            time.sleep(2 ** attempt)
+
+
+def fetch_prices(tickers, start='2017-06-01', end='2021-06-30', max_workers=8):
     """
     Fetch adjusted close prices.
     We fetch a wider window than 2020 to have buffer for rolling calculations.
+
+    Requests are network-bound, so tickers are fetched concurrently.
+    yf.download() keeps its results in module-level state and cannot be
+    called from several threads at once; Ticker.history() has no such state.
     """
     print(f"Fetching {len(tickers)} tickers from {start} to {end}...")
 
-    # Download in batches to avoid timeout
-    batch_size = 50
-    all_data = []
-
-    for i in range(0, len(tickers), batch_size):
-        batch = tickers[i:i+batch_size]
-        print(f"  Batch {i//batch_size + 1}: {batch[0]} ... {batch[-1]}")
-        try:
-            data = yf.download(batch, start=start, end=end,
-                              auto_adjust=True, threads=True)
-            if isinstance(data.columns, pd.MultiIndex):
-                # yfinance return format can vary. Verify structure.
-                try:
-                    closes = data['Close']
-                except KeyError:
-                    # Fallback or try different access if structure is different
-                    print("  'Close' column not found in MultiIndex, checking structure...")
-                    # If 'Close' is not top level, it might be flattened or single level if only 1 ticker in batch?
-                    # With auto_adjust=True, it might just return the adjusted close directly if single ticker?
-                    # But we are downloading batch.
-                    # Recent yfinance might return different structure.
-                    # Let's assume standard behavior for now.
-                    closes = data
-            else:
-                closes = data[['Close']]
-                closes.columns = batch
-            all_data.append(closes)
-        except Exception as e:
-            print(f"  Error in batch: {e}")
-        time.sleep(1)  # Rate limiting
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = {ex.submit(fetch_close, t, start, end): t for t in tickers}
+        for i, fut in enumerate(as_completed(futures), 1):
+            closes = fut.result()
+            if closes is not None:
+                results[futures[fut]] = closes
+            if i % 50 == 0:
+                print(f"  {i}/{len(tickers)} done")
 
+    # Keep the requested ticker order regardless of completion order
+    all_data = [results[t] for t in tickers if t in results]
     df = pd.concat(all_data, axis=1)
 
     # Drop tickers with >10% missing days
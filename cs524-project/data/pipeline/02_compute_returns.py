@@ -12,9 +12,13 @@ PROCESSED_DIR = os.path.join(os.path.dirname(__file__), '..', 'processed')
 if __name__ == '__main__':
     prices = pd.read_parquet(os.path.join(RAW_DIR, 'prices_daily.parquet'))
 
-    # Log returns: ln(P_t / P_{t-1})
-    returns = np.log(prices / prices.shift(1))
-    returns = returns.iloc[1:]  # Drop first NaN row
+    # Log returns: ln(P_t / P_{t-1}), written in place into one buffer
+    # (no shifted frame / ratio frame; NumPy resolves the overlapping
+    # divide operands itself). First row is dropped up front.
+    p = prices.to_numpy(dtype=np.float64, copy=True)
+    np.divide(p[1:], p[:-1], out=p[1:])
+    np.log(p[1:], out=p[1:])
+    returns = pd.DataFrame(p[1:], index=prices.index[1:], columns=prices.columns)
 
     out_path = os.path.join(PROCESSED_DIR, 'returns_log.parquet')
     returns.to_parquet(out_path)
@@ -1,12 +1,15 @@
 """
 Compute Pearson correlation matrices for year 2020 at various N.
-Output: data/processed/corr_matrix_2020_N{n}.json
+Output: data/processed/corr_matrix_2020_N{n}.json (+ .json.gz) for the browser
+        data/processed/corr_matrix_2020_N{n}.feather (full N×N, for Python consumers)
 """
 import pandas as pd
 import numpy as np
-import json
 import os
 
+from _corr import pearson_matrix, write_corr_feather
+from _export import write_json
+
 PROCESSED_DIR = os.path.join(os.path.dirname(__file__), '..', 'processed')
 SUBSETS = [40, 80, 160, 300, 500]
 YEAR = 2020
@@ -25,10 +28,11 @@ def select_top_n_by_volume(returns, prices_path, n, year):
     return sorted(tickers)[:n]
 
 if __name__ == '__main__':
-    returns = pd.read_parquet(os.path.join(PROCESSED_DIR, 'returns_log.parquet'))
-
-    # Filter to year
-    returns_year = returns[returns.index.year == YEAR]
+    # Filter to year (pushed down to the parquet reader)
+    returns_year = pd.read_parquet(
+        os.path.join(PROCESSED_DIR, 'returns_log.parquet'),
+        filters=[('Date', '>=', pd.Timestamp(f'{YEAR}-01-01')),
+                 ('Date', '<', pd.Timestamp(f'{YEAR + 1}-01-01'))])
     print(f"Year {YEAR}: {returns_year.shape[0]} trading days, {returns_year.shape[1]} tickers")
 
     for n in SUBSETS:
@@ -36,19 +40,25 @@ if __name__ == '__main__':
         subset = returns_year[tickers]
 
         # Pearson correlation
-        corr = subset.corr(method='pearson')
+        corr = pearson_matrix(subset.to_numpy())
 
-        # Convert to JSON-friendly format
+        # Matrix is symmetric: store the packed upper triangle (incl.
+        # diagonal) row by row; corr[i][j] for i <= j is at
+        # i*(2n-i+1)/2 + (j-i)
         output = {
             'year': YEAR,
             'n': len(tickers),
             'tickers': tickers,
-            'matrix': corr.values.tolist()  # N×N list of lists (float64)
+            'layout': 'upper-triangle',
+            'matrix': corr[np.triu_indices(len(tickers))].astype(np.float32),
         }
 
         out_path = os.path.join(PROCESSED_DIR, f'corr_matrix_{YEAR}_N{n}.json')
-        with open(out_path, 'w') as f:
-            json.dump(output, f)
+        write_json(out_path, output)
+
+        write_corr_feather(os.path.join(PROCESSED_DIR, f'corr_matrix_{YEAR}_N{n}.feather'),
+                           corr, tickers)
 
         file_size = os.path.getsize(out_path) / 1e6
-        print(f"  N={n}: {len(tickers)} tickers, matrix {len(tickers)}×{len(tickers)}, file {file_size:.2f} MB")
+        gz_size = os.path.getsize(out_path + '.gz') / 1e6
+        print(f"  N={n}: {len(tickers)} tickers, matrix {len(tickers)}×{len(tickers)}, file {file_size:.2f} MB (gzip {gz_size:.2f} MB)")
@@ -4,13 +4,22 @@ Paper axis convention:
   x = end day (e)
   y = window size (w)
   value = Pearson corr of returns[e-w : e] for ticker_a vs ticker_b
-Output: data/processed/prism_pair_{A}_{B}_{YEAR}.json
+Output: data/processed/prism_pair_{A}_{B}_{YEAR}.f32
+          (dense T×T grid[w][e], little-endian float32, row-major, NaN = invalid)
+        data/processed/prism_pair_{A}_{B}_{YEAR}.json
+          (dates and shape for the .f32 file)
 """
 import pandas as pd
 import numpy as np
-import json
+import pyarrow.parquet as pq
+import orjson
 import os
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; the NumPy path is used without it
+    njit = None
+
 PROCESSED_DIR = os.path.join(os.path.dirname(__file__), '..', 'processed')
 YEAR = 2020
 
@@ -24,79 +33,134 @@ PAIRS = [
 
 MIN_WINDOW = 5  # Minimum window size for meaningful correlation
 
-if __name__ == '__main__':
-    returns = pd.read_parquet(os.path.join(PROCESSED_DIR, 'returns_log.parquet'))
-    returns_year = returns[returns.index.year == YEAR]
 
+if njit is not None:
+    # fastmath without 'nnan'/'ninf': invalid cells are written as NaN
+    @njit(parallel=True, cache=True,
+          fastmath={'nsz', 'arcp', 'contract', 'afn', 'reassoc'})
+    def prism_kernel(cA, cB, cAA, cBB, cAB, min_w, out):
+        """
+        Fill out[p, w, e] from per-pair prefix sums, parallel over w.
+        Scalar loops: no temporaries per window size.
+        """
+        P = cA.shape[0]
+        T = cA.shape[1] - 1
+        for w in prange(min_w, T):
+            for p in range(P):
+                for e in range(w, T):
+                    s = e - w
+                    sumA = cA[p, e] - cA[p, s]
+                    sumB = cB[p, e] - cB[p, s]
+                    varA = w * (cAA[p, e] - cAA[p, s]) - sumA * sumA
+                    varB = w * (cBB[p, e] - cBB[p, s]) - sumB * sumB
+                    if varA <= 0.0 or varB <= 0.0:
+                        out[p, w, e] = np.nan
+                    else:
+                        num = w * (cAB[p, e] - cAB[p, s]) - sumA * sumB
+                        out[p, w, e] = num / np.sqrt(varA * varB)
+
+
+def prefix_sums(x):
+    """Cumulative sums along axis 0 with a leading zero row: window sums are c[e] - c[s]."""
+    c = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, out=c[1:])
+    return c
+
+
+def compute_prism_grids(returns_year, pairs):
+    """
+    Compute the dense (w, e) Pearson correlation grids for a batch of pairs.
+
+    returns_year: DataFrame of returns (T days × tickers).
+    pairs: list of (ticker_a, ticker_b).
+
+    Uses prefix sums of r_a, r_b, r_a*r_b, r_a^2 and r_b^2 so every window
+    sum is two array lookups. The per-ticker sums (r, r^2) are computed
+    once over every ticker appearing in any pair and shared between pairs;
+    only r_a*r_b is pair-specific. With numba installed the grid is filled
+    by prism_kernel on all cores; otherwise each window size w is a single
+    NumPy vector op over all pairs and all valid end days e. O(T^2) per
+    pair instead of one np.corrcoef per cell.
+
+    Returns: (P, T, T) float32 array, dense[p, w, e]; NaN where the cell is
+             invalid (w < MIN_WINDOW or w > e) or either window has zero
+             variance.
+    """
+    tickers = sorted({t for pair in pairs for t in pair})
+    col = {t: i for i, t in enumerate(tickers)}
+    ia = [col[a] for a, _ in pairs]
+    ib = [col[b] for _, b in pairs]
+
+    R = returns_year[tickers].to_numpy(dtype=np.float64)
+    c = prefix_sums(R)          # (T+1, K), shared by all pairs
+    cc = prefix_sums(R * R)
+
+    # (P, T+1) rows per pair: lookups into the shared sums + the cross term
+    cA = np.ascontiguousarray(c[:, ia].T)
+    cB = np.ascontiguousarray(c[:, ib].T)
+    cAA = np.ascontiguousarray(cc[:, ia].T)
+    cBB = np.ascontiguousarray(cc[:, ib].T)
+    cAB = np.ascontiguousarray(prefix_sums(R[:, ia] * R[:, ib]).T)
+
+    P, T = len(pairs), len(R)
+    dense = np.full((P, T, T), np.nan, dtype=np.float32)
+    if njit is not None:
+        prism_kernel(cA, cB, cAA, cBB, cAB, MIN_WINDOW, dense)
+        return dense
+
+    for w in range(MIN_WINDOW, T):
+        # Window for end day e is returns[e-w : e]
+        sumA = cA[:, w:T] - cA[:, 0:T - w]
+        sumB = cB[:, w:T] - cB[:, 0:T - w]
+        sumAA = cAA[:, w:T] - cAA[:, 0:T - w]
+        sumBB = cBB[:, w:T] - cBB[:, 0:T - w]
+        sumAB = cAB[:, w:T] - cAB[:, 0:T - w]
+
+        # Branchless zero-variance mask: den > 0 iff both variances > 0
+        num = w * sumAB - sumA * sumB
+        varA = np.maximum(w * sumAA - sumA ** 2, 0.0)
+        varB = np.maximum(w * sumBB - sumB ** 2, 0.0)
+        den = np.sqrt(varA * varB)
+        dense[:, w, w:] = np.where(den > 0, num / np.maximum(den, 1e-30), np.nan)
+
+    return dense
+
+
+if __name__ == '__main__':
+    # Read only the pair tickers and only YEAR's rows
+    returns_path = os.path.join(PROCESSED_DIR, 'returns_log.parquet')
+    available = set(pq.read_schema(returns_path).names)
+    needed = sorted({t for pair in PAIRS for t in pair} & available)
+    returns_year = pd.read_parquet(
+        returns_path, columns=needed,
+        filters=[('Date', '>=', pd.Timestamp(f'{YEAR}-01-01')),
+                 ('Date', '<', pd.Timestamp(f'{YEAR + 1}-01-01'))])
+
+    pairs = []
     for ticker_a, ticker_b in PAIRS:
         if ticker_a not in returns_year.columns or ticker_b not in returns_year.columns:
             print(f"  Skipping {ticker_a}-{ticker_b}: ticker not found")
             continue
+        pairs.append((ticker_a, ticker_b))
 
-        r_a = returns_year[ticker_a].values
-        r_b = returns_year[ticker_b].values
-        T = len(r_a)
-        dates = returns_year.index.strftime('%Y-%m-%d').tolist()
-
-        print(f"Computing Prism for {ticker_a} vs {ticker_b}, T={T} days...")
-
-        # Build (e, w) grid
-        # e = end day index (0..T-1)
-        # w = window size (MIN_WINDOW..T-1)
-        # valid only if w <= e  (i.e., start = e - w >= 0)
-        #
-        # Store as list of {e, w, value} for sparse representation
-        # (triangle shape — not all (e,w) pairs are valid)
-
-        grid = []
-        max_w = T  # Can go up to T-1
-
-        for e in range(MIN_WINDOW, T):
-            for w in range(MIN_WINDOW, e + 1):
-                start = e - w
-                if start < 0:
-                    continue
-                slice_a = r_a[start:e]
-                slice_b = r_b[start:e]
-
-                if len(slice_a) < MIN_WINDOW:
-                    continue
-
-                # Pearson correlation
-                if np.std(slice_a) == 0 or np.std(slice_b) == 0:
-                    corr_val = 0.0
-                else:
-                    corr_val = float(np.corrcoef(slice_a, slice_b)[0, 1])
-                    if np.isnan(corr_val):
-                        corr_val = 0.0
-
-                grid.append({
-                    'e': int(e),
-                    'w': int(w),
-                    'v': round(corr_val, 4)
-                })
-
-        # Also compute as dense 2D array for faster rendering
-        # Dimensions: rows = w (MIN_WINDOW to T-1), cols = e (0 to T-1)
-        # Invalid cells = null
-        max_e = T
-        max_w_dim = T
-        dense = []
-        for w in range(max_w_dim):
-            row = []
-            for e in range(max_e):
-                if w < MIN_WINDOW or w > e:
-                    row.append(None)
-                else:
-                    start = e - w
-                    slice_a = r_a[start:e]
-                    slice_b = r_b[start:e]
-                    if len(slice_a) < MIN_WINDOW or np.std(slice_a) == 0 or np.std(slice_b) == 0:
-                        row.append(None)
-                    else:
-                        val = float(np.corrcoef(slice_a, slice_b)[0, 1])
-                        row.append(round(val, 4) if not np.isnan(val) else None)
-            dense.append(row)
+    T = len(returns_year)
+    dates = returns_year.index.strftime('%Y-%m-%d').tolist()
+
+    # Build (e, w) grids for every pair in one batched pass
+    # e = end day index (0..T-1)
+    # w = window size (MIN_WINDOW..T-1)
+    # valid only if w <= e  (i.e., start = e - w >= 0)
+    print(f"Computing Prism for {len(pairs)} pairs, T={T} days...")
+    grids = compute_prism_grids(returns_year, pairs)
+
+    # Cells in the valid triangle MIN_WINDOW <= w <= e
+    num_valid = (T - MIN_WINDOW) * (T - MIN_WINDOW + 1) // 2
+
+    for (ticker_a, ticker_b), dense in zip(pairs, grids):
+        # Dense grid for rendering as raw float32: dense[w][e]
+        data_filename = f'prism_pair_{ticker_a}_{ticker_b}_{YEAR}.f32'
+        data_path = os.path.join(PROCESSED_DIR, data_filename)
+        dense.astype('<f4').tofile(data_path)
 
         output = {
             'ticker_a': ticker_a,
@@ -105,14 +169,15 @@ if __name__ == '__main__':
             'T': T,
             'min_window': MIN_WINDOW,
             'dates': dates,
-            'grid_sparse': grid,       # For reference
-            'grid_dense': dense,       # For rendering: dense[w][e]
-            'num_valid_cells': len(grid),
+            'grid_file': data_filename,
+            'dtype': 'f32',
+            'layout': 'row-major',
+            'num_valid_cells': num_valid,
         }
 
         out_path = os.path.join(PROCESSED_DIR, f'prism_pair_{ticker_a}_{ticker_b}_{YEAR}.json')
-        with open(out_path, 'w') as f:
-            json.dump(output, f)
+        with open(out_path, 'wb') as f:
+            f.write(orjson.dumps(output))
 
-        file_size = os.path.getsize(out_path) / 1e6
-        print(f"  {ticker_a} vs {ticker_b}: {len(grid)} valid cells, T={T}, file {file_size:.2f} MB")
+        file_size = (os.path.getsize(out_path) + os.path.getsize(data_path)) / 1e6
+        print(f"  {ticker_a} vs {ticker_b}: {num_valid} valid cells, T={T}, file {file_size:.2f} MB")
@@ -4,14 +4,21 @@ Compute FULL Pearson correlation matrices for all available tickers, per year.
 The paper pre-computes yearly correlations for ALL stocks (Section IV-A).
 The browser then slices the relevant sub-matrix based on cluster membership.
 
-Output: data/processed/full_corr_{YEAR}.json per available year
+Output: data/processed/full_corr_{YEAR}.f32 per available year
+          (little-endian float32, packed upper triangle incl. diagonal)
+        data/processed/full_corr_{YEAR}.json per available year
+          (tickers and shape for the .f32 file)
+        data/processed/full_corr_{YEAR}.feather per available year
+          (full N×N float64 matrix, for Python consumers)
         data/processed/correlation_manifest.json (lists what's available)
 """
 import pandas as pd
 import numpy as np
-import json
+import orjson
 import os
 
+from _corr import pearson_matrix, write_corr_feather
+
 PROCESSED_DIR = os.path.join(os.path.dirname(__file__), '..', 'processed')
 
 # Minimum trading days required for a year to be usable
@@ -37,29 +44,29 @@ def compute_yearly_correlations(returns_df):
             print(f"  Year {year}: only {len(year_data)} days (need {MIN_TRADING_DAYS}). Skipping.")
             continue
         
-        # Drop tickers with too many NaNs in this year
-        valid_cols = year_data.columns[year_data.notna().sum() > MIN_TRADING_DAYS]
-        year_data = year_data[valid_cols].dropna(axis=1, how='any')
-        
-        tickers = sorted(year_data.columns.tolist())
-        year_data = year_data[tickers]  # Ensure consistent ordering
-        
-        print(f"  Year {year}: {len(year_data)} days × {len(tickers)} tickers")
+        # Keep tickers with no missing days this year (and more than
+        # MIN_TRADING_DAYS observations), from a single pass over the array
+        arr = year_data.to_numpy()
+        n_obs = (~np.isnan(arr)).sum(axis=0)
+        col_ok = (n_obs > MIN_TRADING_DAYS) & (n_obs == len(arr))
         
-        # Pearson correlation
-        corr_matrix = year_data.corr(method='pearson')
+        # Column indices in ticker order (consistent ordering)
+        names = year_data.columns.to_numpy()
+        cols = np.flatnonzero(col_ok)
+        cols = cols[np.argsort(names[cols])]
+        tickers = names[cols].tolist()
+        arr = arr[:, cols]
         
-        # Replace NaN with 0 (stocks with zero variance)
-        corr_matrix = corr_matrix.fillna(0)
+        print(f"  Year {year}: {len(arr)} days × {len(tickers)} tickers")
         
-        # Round to 4 decimal places to reduce JSON size
-        matrix_rounded = np.round(corr_matrix.values, 4).tolist()
+        # Pearson correlation (NaN from zero-variance stocks -> 0)
+        corr_matrix = pearson_matrix(arr)
         
         results[year] = {
             'tickers': tickers,
-            'matrix': matrix_rounded,
+            'matrix': corr_matrix,
             'n_tickers': len(tickers),
-            'n_days': len(year_data),
+            'n_days': len(arr),
         }
     
     return results
@@ -84,23 +91,37 @@ if __name__ == '__main__':
     
     for year, data in sorted(yearly.items()):
         filename = f'full_corr_{year}.json'
+        data_filename = f'full_corr_{year}.f32'
         out_path = os.path.join(PROCESSED_DIR, filename)
+        data_path = os.path.join(PROCESSED_DIR, data_filename)
+        
+        # Matrix is symmetric: packed upper triangle (incl. diagonal) as raw
+        # float32, row by row; corr[i][j] for i <= j is at i*(2n-i+1)/2 + (j-i)
+        # (browser: new Float32Array(await resp.arrayBuffer()))
+        n = data['n_tickers']
+        data['matrix'][np.triu_indices(n)].astype('<f4').tofile(data_path)
         
         output = {
             'year': year,
             'tickers': data['tickers'],
             'n_tickers': data['n_tickers'],
             'n_days': data['n_days'],
-            'matrix': data['matrix'],
+            'data_file': data_filename,
+            'dtype': 'f32',
+            'layout': 'upper-triangle',
         }
         
-        with open(out_path, 'w') as f:
-            json.dump(output, f)
+        with open(out_path, 'wb') as f:
+            f.write(orjson.dumps(output))
+        
+        write_corr_feather(os.path.join(PROCESSED_DIR, f'full_corr_{year}.feather'),
+                           data['matrix'], data['tickers'])
         
-        file_size = os.path.getsize(out_path) / 1e6
+        file_size = (os.path.getsize(out_path) + os.path.getsize(data_path)) / 1e6
         manifest['years'].append(year)
         manifest['files'][str(year)] = {
             'filename': filename,
+            'data_filename': data_filename,
             'n_tickers': data['n_tickers'],
             'n_days': data['n_days'],
             'file_size_mb': round(file_size, 2),
@@ -109,7 +130,7 @@ if __name__ == '__main__':
     
     # Save manifest (browser loads this first to know what's available)
     manifest_path = os.path.join(PROCESSED_DIR, 'correlation_manifest.json')
-    with open(manifest_path, 'w') as f:
-        json.dump(manifest, f, indent=2)
+    with open(manifest_path, 'wb') as f:
+        f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
     print(f"\nManifest: {manifest_path}")
     print(f"Available years: {manifest['years']}")
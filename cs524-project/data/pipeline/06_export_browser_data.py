@@ -2,25 +2,27 @@
 Export browser-ready JSON data for dynamic Prism computation and Knowledge Graph.
 
 Outputs:
-  data/processed/returns_all.json       — log returns for all available years
+  data/processed/returns_all.json       — log returns for all available years (+ .json.gz)
   data/processed/sp500_metadata.json    — sector, sub-industry, HQ per ticker
 """
 import pandas as pd
 import numpy as np
-import json
+import orjson
 import os
 
+from _export import write_json
+from _sp500_wiki import load_table
+
 PROCESSED_DIR = os.path.join(os.path.dirname(__file__), '..', 'processed')
 MIN_TRADING_DAYS = 200
 
 
 def get_sp500_metadata():
     """
-    Scrape S&P 500 metadata from Wikipedia.
+    S&P 500 metadata from the Wikipedia table (cached by 01_fetch_prices.py).
     Returns dict: ticker -> {sector, subIndustry, hqLocation, hqState}
     """
-    tables = pd.read_html('https://en.wikipedia.org/wiki/List_of_S%26P_500_companies')
-    df = tables[0]
+    df = load_table()
 
     metadata = {}
     for _, row in df.iterrows():
@@ -90,14 +92,12 @@ if __name__ == '__main__':
         dates = year_data.index.strftime('%Y-%m-%d').tolist()
 
         # Build returns array: returns_matrix[ticker_idx][day_idx]
-        returns_matrix = []
-        for t in all_tickers:
-            if t in year_data.columns:
-                vals = year_data[t].values.tolist()
-                vals = [0.0 if (v != v) else round(v, 6) for v in vals]
-            else:
-                vals = [0.0] * len(dates)
-            returns_matrix.append(vals)
+        # Missing tickers are filled by the reindex, NaN days by nan_to_num.
+        # float32 halves the buffer; orjson writes it without a .tolist()
+        mat = year_data.reindex(columns=all_tickers, fill_value=0.0) \
+                       .to_numpy(dtype=np.float32).T.copy()
+        np.nan_to_num(mat, copy=False, nan=0.0)
+        returns_matrix = np.round(mat, 6)
 
         returns_output['years'][str(year)] = {
             'dates': dates,
@@ -107,13 +107,13 @@ if __name__ == '__main__':
         print(f"  Year {year}: {len(dates)} trading days")
 
     out_path = os.path.join(PROCESSED_DIR, 'returns_all.json')
-    with open(out_path, 'w') as f:
-        json.dump(returns_output, f)
+    write_json(out_path, returns_output)
     file_size = os.path.getsize(out_path) / 1e6
-    print(f"Returns saved: {out_path} ({file_size:.1f} MB)")
+    gz_size = os.path.getsize(out_path + '.gz') / 1e6
+    print(f"Returns saved: {out_path} ({file_size:.1f} MB, gzip {gz_size:.1f} MB)")
 
     # ── 2. Export metadata ──
-    print("\nFetching S&P 500 metadata from Wikipedia...")
+    print("\nLoading S&P 500 metadata from the cached Wikipedia table...")
     try:
         meta = get_sp500_metadata()
         print(f"  Wikipedia: {len(meta)} tickers")
@@ -134,17 +134,14 @@ if __name__ == '__main__':
             }
 
     # Build sector/industry/state summary for reference
-    sector_counts = {}
-    state_counts = {}
-    for t in all_tickers:
-        s = meta[t]['sector']
-        st = meta[t]['hqState']
-        sector_counts[s] = sector_counts.get(s, 0) + 1
-        state_counts[st] = state_counts.get(st, 0) + 1
+    ticker_meta = {t: meta[t] for t in all_tickers}
+    meta_df = pd.DataFrame.from_dict(ticker_meta, orient='index')
+    sector_counts = meta_df['sector'].value_counts().to_dict()
+    state_counts = meta_df['hqState'].value_counts().to_dict()
 
     meta_output = {
         'tickers': all_tickers,
-        'metadata': {t: meta[t] for t in all_tickers},
+        'metadata': ticker_meta,
         'summary': {
             'sectors': sector_counts,
             'states': state_counts,
@@ -152,8 +149,8 @@ if __name__ == '__main__':
     }
 
     out_path = os.path.join(PROCESSED_DIR, 'sp500_metadata.json')
-    with open(out_path, 'w') as f:
-        json.dump(meta_output, f)
+    with open(out_path, 'wb') as f:
+        f.write(orjson.dumps(meta_output))
     file_size = os.path.getsize(out_path) / 1e6
     print(f"Metadata saved: {out_path} ({file_size:.1f} MB)")
     print(f"\nSector distribution:")
@@ -0,0 +1,30 @@
+"""
+Shared correlation helpers for 03_compute_correlations.py and
+05_compute_full_correlations.py, so both produce the same numerics.
+"""
+import pandas as pd
+import numpy as np
+import pyarrow.feather as feather
+
+
+def pearson_matrix(arr):
+    """
+    Pearson correlation of the columns of a (days, tickers) array.
+
+    np.corrcoef centers the data and forms the covariance with a single
+    BLAS product, without DataFrame.corr's per-pair overhead.
+    Zero-variance columns come out as 0 (DataFrame.corr gave NaN).
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = np.corrcoef(np.asarray(arr, dtype=np.float64), rowvar=False)
+    np.nan_to_num(corr, copy=False)
+    return corr
+
+
+def write_corr_feather(path, corr, tickers):
+    """
+    Write the full float64 matrix as ticker-labelled Feather (Arrow IPC),
+    so Python consumers read it back typed, without JSON parsing.
+    """
+    feather.write_feather(pd.DataFrame(corr, index=tickers, columns=tickers),
+                          path, compression='lz4')
@@ -0,0 +1,21 @@
+"""
+Shared JSON writer for the browser outputs of 03_compute_correlations.py
+and 06_export_browser_data.py.
+"""
+import orjson
+import gzip
+
+
+def write_json(path, obj, gz=True):
+    """
+    Serialize obj with orjson (NumPy arrays included) to path.
+
+    With gz=True also write path + '.gz', a precompressed copy for servers
+    that send it with Content-Encoding: gzip.
+    """
+    payload = orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    with open(path, 'wb') as f:
+        f.write(payload)
+    if gz:
+        with gzip.open(path + '.gz', 'wb', compresslevel=6) as f:
+            f.write(payload)
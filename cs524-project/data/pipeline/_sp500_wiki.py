@@ -0,0 +1,40 @@
+"""
+Shared S&P 500 constituents table scraped from Wikipedia.
+
+Used by 01_fetch_prices.py (tickers) and 06_export_browser_data.py
+(sector / sub-industry / HQ metadata). The parsed table is cached to
+data/raw/sp500_wiki.parquet so the page is fetched and parsed once.
+"""
+import pandas as pd
+import os
+import functools
+import requests
+from io import StringIO
+
+RAW_DIR = os.path.join(os.path.dirname(__file__), '..', 'raw')
+CACHE_PATH = os.path.join(RAW_DIR, 'sp500_wiki.parquet')
+
+WIKI_URL = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+
+
+@functools.lru_cache(maxsize=None)
+def load_table(refresh=False):
+    """
+    Return the S&P 500 constituents table (first table on the Wikipedia page).
+
+    Reads the on-disk cache when present; otherwise (or with refresh=True)
+    scrapes Wikipedia and rewrites the cache.
+    """
+    if not refresh and os.path.exists(CACHE_PATH):
+        return pd.read_parquet(CACHE_PATH)
+
+    response = requests.get(WIKI_URL, headers=HEADERS)
+    response.raise_for_status()
+
+    # Use StringIO to wrap the HTML content
+    df = pd.read_html(StringIO(response.text))[0]
+
+    os.makedirs(RAW_DIR, exist_ok=True)
+    df.to_parquet(CACHE_PATH)
+    return df
@@ -0,0 +1,25 @@
+/**
+ * Correlation matrix layout helpers
+ *
+ * Shared by matrix.js, matrix-enriched.js and network-view.js.
+ */
+
+const CorrLayout = (function () {
+    'use strict';
+
+    // Correlation matrices are symmetric and stored as the upper triangle
+    // (incl. diagonal), row by row. Expand to n rows of a full n×n buffer.
+    function unpackUpperTriangle(packed, n) {
+        const full = new Float32Array(n * n);
+        let k = 0;
+        for (let i = 0; i < n; i++) {
+            for (let j = i; j < n; j++, k++) {
+                full[i * n + j] = packed[k];
+                full[j * n + i] = packed[k];
+            }
+        }
+        return Array.from({ length: n }, (_, i) => full.subarray(i * n, (i + 1) * n));
+    }
+
+    return { unpackUpperTriangle };
+})();
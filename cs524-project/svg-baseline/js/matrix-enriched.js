@@ -121,6 +121,9 @@ const MatrixEnriched = (function () {
                 const resp = await fetch(url);
                 if (!resp.ok) throw new Error(`HTTP ${resp.status}`);
                 data = await resp.json();
+                if (data.layout === 'upper-triangle') {
+                    data.matrix = CorrLayout.unpackUpperTriangle(data.matrix, data.n);
+                }
             } catch (e) {
                 container.textContent = `Error loading N=${N}: ${e.message}`;
                 return null;
@@ -135,6 +135,9 @@ async function loadAndRender(n) {
     try {
         const resp = await fetch(url);
         data = await resp.json();
+        if (data.layout === 'upper-triangle') {
+            data.matrix = CorrLayout.unpackUpperTriangle(data.matrix, data.n);
+        }
     } catch (e) {
         metricsEl.textContent = `ERROR: Could not load ${url}\n${e.message}`;
         return;
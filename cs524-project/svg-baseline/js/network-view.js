@@ -49,6 +49,15 @@ const NetworkView = (function () {
             if (!resp.ok) throw new Error(`HTTP ${resp.status} ${resp.statusText}`);
             const data = await resp.json();
 
+            // Matrix is a raw float32 blob next to the JSON index
+            const binResp = await fetch(`${DATA_BASE}${data.data_file}`);
+            if (!binResp.ok) throw new Error(`HTTP ${binResp.status} ${binResp.statusText}`);
+            const flat = new Float32Array(await binResp.arrayBuffer());
+            const n = data.n_tickers;
+            const matrix = data.layout === 'upper-triangle'
+                ? CorrLayout.unpackUpperTriangle(flat, n)
+                : Array.from({ length: n }, (_, i) => flat.subarray(i * n, (i + 1) * n));
+
             // Build ticker → index lookup
             const tickerIndex = {};
             data.tickers.forEach((t, i) => { tickerIndex[t] = i; });
@@ -56,7 +65,7 @@ const NetworkView = (function () {
             correlationData[year] = {
                 year: data.year,
                 tickers: data.tickers,
-                matrix: data.matrix,
+                matrix: matrix,
                 tickerIndex: tickerIndex,
                 nTickers: data.n_tickers,
                 nDays: data.n_days,
@@ -30,15 +30,19 @@ const PrismMulti = (function () {
         try {
             const resp = await fetch(url);
             data = await resp.json();
+            // Dense grid is a raw row-major float32 blob, NaN for invalid cells
+            const gridResp = await fetch(`${DATA_BASE}${data.grid_file}`);
+            if (!gridResp.ok) throw new Error(`HTTP ${gridResp.status}`);
+            data.grid = new Float32Array(await gridResp.arrayBuffer());
         } catch (e) {
-            container.textContent = `Error: ${tickerA}_${tickerB} not found`;
+            container.textContent = `Error loading ${tickerA}_${tickerB}: ${e.message}`;
             return null;
         }
         const t_load_end = performance.now();
 
         const T = data.T;
         const minW = data.min_window;
-        const dense = data.grid_dense;
+        const grid = data.grid;   // grid[w * T + e], NaN for invalid
         const dates = data.dates;
 
         const cellSize = Math.max(1, Math.min(3, Math.floor(maxW / T)));
@@ -50,8 +54,8 @@ const PrismMulti = (function () {
         const cells = [];
         for (let w = minW; w < T; w++) {
             for (let e = w; e < T; e++) {
-                const val = dense[w] && dense[w][e];
-                if (val !== null && val !== undefined) {
+                const val = grid[w * T + e];
+                if (!Number.isNaN(val)) {
                     cells.push({ e, w, value: val });
                 }
             }
@@ -123,6 +123,10 @@ async function loadAndRender(pair) {
     try {
         const resp = await fetch(url);
         data = await resp.json();
+        // Dense grid is a raw row-major float32 blob, NaN for invalid cells
+        const gridResp = await fetch(`${DATA_BASE}${data.grid_file}`);
+        if (!gridResp.ok) throw new Error(`HTTP ${gridResp.status}`);
+        data.grid = new Float32Array(await gridResp.arrayBuffer());
     } catch (e) {
         metricsEl.textContent = `ERROR: Could not load ${url}\n${e.message}`;
         return;
@@ -131,7 +135,7 @@ async function loadAndRender(pair) {
 
     const T = data.T;
     const minW = data.min_window;
-    const dense = data.grid_dense;   // dense[w][e], null for invalid
+    const grid = data.grid;          // grid[w * T + e], NaN for invalid
     const dates = data.dates;
     const validCells = data.num_valid_cells;
 
@@ -142,8 +146,8 @@ async function loadAndRender(pair) {
     const cells = [];
     for (let w = minW; w < T; w++) {
         for (let e = w; e < T; e++) {
-            const val = dense[w] && dense[w][e];
-            if (val !== null && val !== undefined) {
+            const val = grid[w * T + e];
+            if (!Number.isNaN(val)) {
                 cells.push({ e, w, value: val });
             }
         }